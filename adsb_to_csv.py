@@ -19,11 +19,12 @@ Environment Variables:
 """
 
 import csv
+import signal
 import socket
 import sys
 import time
 from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 # Import shared configuration
 from src.lib.config import (
@@ -35,6 +36,7 @@ from src.lib.config import (
     CSV_COLUMNS,
     RECONNECT_DELAY,
     FLUSH_INTERVAL,
+    FLUSH_MAX_DELAY,
     CURRENT_UPDATE_INTERVAL,
 )
 
@@ -73,9 +75,10 @@ def write_current_positions_csv(csv_path, current_positions: Dict[str, Dict[str,
             except (ValueError, KeyError):
                 recent_positions.append((icao, pos))
 
-        # Write sorted by ICAO for consistency
-        for icao, pos in sorted(recent_positions, key=lambda x: x[0]):
-            writer.writerow([
+        # Write sorted by ICAO for consistency, in a single writerows call
+        recent_positions.sort(key=lambda x: x[0])
+        writer.writerows(
+            (
                 pos["timestamp_utc"],
                 pos["icao"],
                 pos["flight"],
@@ -85,7 +88,9 @@ def write_current_positions_csv(csv_path, current_positions: Dict[str, Dict[str,
                 pos["speed_kts"] if pos["speed_kts"] is not None else "",
                 pos["heading_deg"] if pos["heading_deg"] is not None else "",
                 pos["squawk"] if pos["squawk"] else "",
-            ])
+            )
+            for _, pos in recent_positions
+        )
 
 
 def parse_sbs_line(line: str) -> Optional[Dict[str, Any]]:
@@ -108,13 +113,13 @@ def parse_sbs_line(line: str) -> Optional[Dict[str, Any]]:
     Returns dict with parsed fields (partial data allowed), or None if line is invalid.
     """
     line = line.strip()
-    if not line:
+    # Must be a MSG type; reject other records before splitting them
+    if not line.startswith("MSG,"):
         return None
 
     fields = line.split(",")
 
-    # Must be a MSG type
-    if len(fields) < 5 or fields[0] != "MSG":
+    if len(fields) < 5:
         return None
 
     icao = fields[4].strip()
@@ -188,9 +193,11 @@ def parse_sbs_line(line: str) -> Optional[Dict[str, Any]]:
 aircraft_state: Dict[str, Dict[str, Any]] = {}
 
 
-def update_aircraft_state(parsed: Dict[str, Any]) -> tuple[Optional[Dict[str, Any]], bool]:
+def update_aircraft_state(parsed: Dict[str, Any],
+                          timestamp_utc: Optional[str] = None) -> tuple[Optional[Dict[str, Any]], bool]:
     """
     Update tracked aircraft state with new data.
+    timestamp_utc is the receive time of the message (defaults to now).
     Returns tuple of (position_record, is_complete).
     - position_record: dict if we have lat/lon, None otherwise (for history CSV)
     - is_complete: True if we have position AND velocity data (for current CSV)
@@ -229,7 +236,9 @@ def update_aircraft_state(parsed: Dict[str, Any]) -> tuple[Optional[Dict[str, An
     if parsed["squawk"]:
         state["squawk"] = parsed["squawk"]
 
-    state["last_update"] = datetime.now(timezone.utc).isoformat()
+    if timestamp_utc is None:
+        timestamp_utc = datetime.now(timezone.utc).isoformat()
+    state["last_update"] = timestamp_utc
 
     # Only return a record if we have a valid position
     if state["lat"] is not None and state["lon"] is not None:
@@ -250,24 +259,29 @@ def update_aircraft_state(parsed: Dict[str, Any]) -> tuple[Optional[Dict[str, An
     return None, False
 
 
-def write_position(csv_path, position: Dict[str, Any], timestamp_utc: Optional[str] = None) -> None:
-    """Write a position record to the CSV file."""
-    if timestamp_utc is None:
-        timestamp_utc = datetime.now(timezone.utc).isoformat()
+def position_row(position: Dict[str, Any], timestamp_utc: str) -> List[Any]:
+    """Build the CSV row for a position record."""
+    return [
+        timestamp_utc,
+        position["icao"],
+        position["flight"],
+        position["lat"],
+        position["lon"],
+        position["altitude_ft"] if position["altitude_ft"] is not None else "",
+        position["speed_kts"] if position["speed_kts"] is not None else "",
+        position["heading_deg"] if position["heading_deg"] is not None else "",
+        position["squawk"] if position["squawk"] else "",
+    ]
+
+
+def write_positions(csv_path, rows: List[List[Any]]) -> None:
+    """Append buffered position rows to the CSV file in a single write."""
+    if not rows:
+        return
 
     with open(csv_path, "a", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
-        writer.writerow([
-            timestamp_utc,
-            position["icao"],
-            position["flight"],
-            position["lat"],
-            position["lon"],
-            position["altitude_ft"] if position["altitude_ft"] is not None else "",
-            position["speed_kts"] if position["speed_kts"] is not None else "",
-            position["heading_deg"] if position["heading_deg"] is not None else "",
-            position["squawk"] if position["squawk"] else "",
-        ])
+        writer.writerows(rows)
 
 
 def connect_to_dump1090(host: str, port: int) -> socket.socket:
@@ -281,6 +295,35 @@ def connect_to_dump1090(host: str, port: int) -> socket.socket:
         raise
 
 
+def iter_stream_lines(sock: socket.socket, idle_timeout: float):
+    """
+    Yield decoded lines from the SBS-1 stream until the connection closes.
+
+    Yields None whenever idle_timeout seconds pass without data, so the
+    caller can do housekeeping while the stream is quiet.
+    """
+    sock.settimeout(idle_timeout)
+    buffer = b""
+    while True:
+        try:
+            chunk = sock.recv(65536)
+        except socket.timeout:
+            yield None
+            continue
+        if not chunk:
+            return
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line.decode("utf-8", errors="replace")
+
+
+def exit_on_sigterm(signum, frame) -> None:
+    """Turn SIGTERM (adsb.sh stops the logger with pkill) into a clean exit."""
+    raise SystemExit(0)
+
+
 def main():
     """Main processing loop."""
     # Get configuration
@@ -301,84 +344,114 @@ def main():
     # Track latest position for each aircraft
     current_positions: Dict[str, Dict[str, Any]] = {}
 
+    # History rows are buffered and appended every FLUSH_INTERVAL records,
+    # or after FLUSH_MAX_DELAY seconds, including while the stream is quiet
+    pending_rows: List[List[Any]] = []
+
     record_count = 0
     last_flush_count = 0
+    last_flush_time = time.monotonic()
     last_current_update = 0
 
-    while True:
-        try:
-            sock = connect_to_dump1090(host, port)
+    signal.signal(signal.SIGTERM, exit_on_sigterm)
 
-            with sock.makefile("r", encoding="utf-8", errors="replace") as f:
-                print("Reading SBS-1 stream... (Ctrl+C to stop)")
-
-                for line in f:
-                    try:
-                        parsed = parse_sbs_line(line)
-                        if parsed:
-                            # Update aircraft state with this message's data
-                            position, is_complete = update_aircraft_state(parsed)
-
-                            # Only write complete records (with position + velocity)
-                            # to avoid incomplete data in both history and current CSVs
-                            if position and is_complete:
+    try:
+        while True:
+            try:
+                sock = connect_to_dump1090(host, port)
+
+                with sock:
+                    print("Reading SBS-1 stream... (Ctrl+C to stop)")
+
+                    for line in iter_stream_lines(sock, FLUSH_MAX_DELAY):
+                        if line is None:
+                            # Stream is quiet; don't hold buffered rows back
+                            write_positions(csv_path, pending_rows)
+                            pending_rows.clear()
+                            last_flush_count = record_count
+                            last_flush_time = time.monotonic()
+                            continue
+
+                        try:
+                            parsed = parse_sbs_line(line)
+                            if parsed:
+                                # Timestamp the message once; shared by state and records
                                 timestamp_utc = datetime.now(timezone.utc).isoformat()
-                                position_with_ts = {**position, "timestamp_utc": timestamp_utc}
-
-                                # Write to historical CSV
-                                write_position(csv_path, position, timestamp_utc)
-
-                                # Update current positions
-                                icao = position["icao"]
-                                current_positions[icao] = position_with_ts
-
-                            record_count += 1
 
-                            # Update current positions CSV periodically
-                            if record_count - last_current_update >= CURRENT_UPDATE_INTERVAL:
-                                write_current_positions_csv(
-                                    current_csv_path,
-                                    current_positions,
-                                    max_age
-                                )
-                                last_current_update = record_count
-
-                            # Periodic status update
-                            if record_count - last_flush_count >= FLUSH_INTERVAL:
+                                # Update aircraft state with this message's data
+                                position, is_complete = update_aircraft_state(parsed, timestamp_utc)
+
+                                # Only write complete records (with position + velocity)
+                                # to avoid incomplete data in both history and current CSVs
+                                if position and is_complete:
+                                    position_with_ts = {**position, "timestamp_utc": timestamp_utc}
+
+                                    # Queue for the historical CSV
+                                    pending_rows.append(position_row(position, timestamp_utc))
+
+                                    # Update current positions
+                                    icao = position["icao"]
+                                    current_positions[icao] = position_with_ts
+
+                                record_count += 1
+
+                                # Update current positions CSV periodically
+                                if record_count - last_current_update >= CURRENT_UPDATE_INTERVAL:
+                                    write_current_positions_csv(
+                                        current_csv_path,
+                                        current_positions,
+                                        max_age
+                                    )
+                                    last_current_update = record_count
+
+                                # Periodic flush
+                                now_mono = time.monotonic()
+                                if (record_count - last_flush_count >= FLUSH_INTERVAL
+                                        or now_mono - last_flush_time >= FLUSH_MAX_DELAY):
+                                    write_positions(csv_path, pending_rows)
+                                    pending_rows.clear()
+                                    last_flush_count = record_count
+                                    last_flush_time = now_mono
+
+                                # Status update
                                 if record_count % 100 == 0:
                                     aircraft_count = len(current_positions)
                                     print(f"Logged {record_count} positions ({aircraft_count} aircraft)...", end="\r")
-                                last_flush_count = record_count
-
-                    except Exception as e:
-                        print(f"\nWarning: Error parsing line: {e}", file=sys.stderr)
-                        continue
-
-        except KeyboardInterrupt:
-            # Final update before exit
-            if current_positions:
-                write_current_positions_csv(current_csv_path, current_positions, max_age)
-
-            now = datetime.now(timezone.utc)
-            cutoff_time = now - timedelta(seconds=max_age)
-            recent_count = sum(
-                1 for pos in current_positions.values()
-                if datetime.fromisoformat(pos["timestamp_utc"].replace("Z", "+00:00")) >= cutoff_time
-            )
-            aircraft_count = len(current_positions)
-            print(f"\n\nStopped by user. Total positions logged: {record_count} "
-                  f"({aircraft_count} unique aircraft, {recent_count} in last {max_age}s)")
-            sys.exit(0)
-
-        except (socket.error, OSError, ConnectionError) as e:
-            print(f"Connection error: {e}")
-            print(f"Reconnecting in {RECONNECT_DELAY} seconds... (Press Ctrl+C to exit)")
-            time.sleep(RECONNECT_DELAY)
-
-        except Exception as e:
-            print(f"\nUnexpected error: {e}", file=sys.stderr)
-            print(f"Reconnecting in {RECONNECT_DELAY} seconds...")
-            time.sleep(RECONNECT_DELAY)
+
+                        except Exception as e:
+                            print(f"\nWarning: Error parsing line: {e}", file=sys.stderr)
+                            continue
+
+            except KeyboardInterrupt:
+                # Final update before exit (history rows are flushed below)
+                if current_positions:
+                    write_current_positions_csv(current_csv_path, current_positions, max_age)
+
+                now = datetime.now(timezone.utc)
+                cutoff_time = now - timedelta(seconds=max_age)
+                recent_count = sum(
+                    1 for pos in current_positions.values()
+                    if datetime.fromisoformat(pos["timestamp_utc"].replace("Z", "+00:00")) >= cutoff_time
+                )
+                aircraft_count = len(current_positions)
+                print(f"\n\nStopped by user. Total positions logged: {record_count} "
+                      f"({aircraft_count} unique aircraft, {recent_count} in last {max_age}s)")
+                sys.exit(0)
+
+            except (socket.error, OSError, ConnectionError) as e:
+                print(f"Connection error: {e}")
+                print(f"Reconnecting in {RECONNECT_DELAY} seconds... (Press Ctrl+C to exit)")
+                time.sleep(RECONNECT_DELAY)
+
+            except Exception as e:
+                print(f"\nUnexpected error: {e}", file=sys.stderr)
+                print(f"Reconnecting in {RECONNECT_DELAY} seconds...")
+                time.sleep(RECONNECT_DELAY)
+
+    finally:
+        # Runs on Ctrl+C, SIGTERM and unexpected exits alike
+        write_positions(csv_path, pending_rows)
+        pending_rows.clear()
 
 
 if __name__ == "__main__":
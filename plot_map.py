@@ -14,82 +14,295 @@ Usage:
 
 import argparse
 import csv
+import gzip
+import hashlib
 import json
+import math
 import os
 import sys
+from collections import defaultdict
 from datetime import datetime, timezone
+from html import escape
+from operator import itemgetter
 from typing import List, Dict, Any, Optional
 
 # Import shared modules
 from src.lib.config import (
-    PROJECT_ROOT, OUTPUT_DIR, ICONS_DIR,
+    PROJECT_ROOT, OUTPUT_DIR, ICONS_DIR, CSV_COLUMNS,
     get_history_csv_path, get_current_csv_path,
     DEFAULT_MAP_HTML, DEFAULT_CURRENT_MAP_HTML,
 )
 from src.lib.geo import (
     get_home_location, set_home_from_address, setup_home_location,
-    calculate_bearing, calculate_3d_distance,
+    calculate_bearings, calculate_3d_distance,
 )
-from src.lib.colors import get_altitude_color, get_altitude_color_js
+from src.lib.colors import get_altitude_color, get_altitude_hex_color
 
 # Import aircraft database
 try:
-    from aircraft_db import get_aircraft_info, get_icon_for_type, AircraftDatabase
+    from aircraft_db import get_aircraft_info, get_icon_for_type, get_database
     AIRCRAFT_DB_AVAILABLE = True
 except ImportError:
     AIRCRAFT_DB_AVAILABLE = False
     print("Warning: aircraft_db module not available, using default icons", file=sys.stderr)
 
+# Optional faster JSON encoder for the map data
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Coordinates are sent to the browser as integer micro-degrees (~11 cm resolution),
+# headings as integer tenths of a degree
+COORD_SCALE = 1000000
+
+# Positions of the same aircraft closer than this (in degrees) are duplicates
+DUPLICATE_TOLERANCE_DEG = 0.0001
+
+# Archived track vertices closer than this (in degrees, ~50 m) to the previous
+# kept vertex are dropped; they are sub-pixel at the usual zoom levels
+TRACK_THIN_DEG = 0.0005
+
+# At this zoom and below, archived tracks are shown as one dot per aircraft
+TRACK_DOT_MAX_ZOOM = 7
+
+# SVG icons serialized for the page, loaded once per process
+_svg_icons_json: Optional[str] = None
+
+# Aircraft type info per ICAO (None if unknown), so repeat aircraft skip the database
+_aircraft_type_cache: Dict[str, Optional[Dict[str, str]]] = {}
+
+
+class PositionIndex:
+    """
+    Grid-bucketed spatial index for near-duplicate position lookups.
+
+    Positions are bucketed per ICAO into cells the size of the duplicate
+    tolerance, so a lookup only checks the 3x3 neighbouring cells instead
+    of scanning every known position.
+    """
+
+    def __init__(self, positions=()):
+        self._cells: Dict[tuple, List[tuple]] = {}
+        for p in positions:
+            self.add(p)
+
+    @staticmethod
+    def _cell(lat: float, lon: float) -> tuple:
+        return (math.floor(lat / DUPLICATE_TOLERANCE_DEG),
+                math.floor(lon / DUPLICATE_TOLERANCE_DEG))
+
+    def add(self, position: Dict[str, Any]) -> None:
+        """Add a position to the index."""
+        lat, lon = position["lat"], position["lon"]
+        cell_lat, cell_lon = self._cell(lat, lon)
+        self._cells.setdefault((position["icao"], cell_lat, cell_lon), []).append((lat, lon))
+
+    def is_duplicate(self, position: Dict[str, Any]) -> bool:
+        """Check if the same aircraft already has a position within tolerance."""
+        icao, lat, lon = position["icao"], position["lat"], position["lon"]
+        cell_lat, cell_lon = self._cell(lat, lon)
+        for d_lat in (-1, 0, 1):
+            for d_lon in (-1, 0, 1):
+                for other_lat, other_lon in self._cells.get((icao, cell_lat + d_lat, cell_lon + d_lon), ()):
+                    if (abs(other_lat - lat) < DUPLICATE_TOLERANCE_DEG and
+                            abs(other_lon - lon) < DUPLICATE_TOLERANCE_DEG):
+                        return True
+        return False
+
+
+def position_fields_getter(header: List[str]):
+    """
+    Build a function returning the CSV_COLUMNS fields of a csv.reader row.
+
+    Column positions are resolved once from the header, so each row is
+    picked apart with a single itemgetter call. Columns missing from the
+    header, or from a short row, read as an empty string.
+    """
+    width = len(header)
+    getter = itemgetter(*[header.index(c) if c in header else width for c in CSV_COLUMNS])
+    padding = [""] * width
+
+    def get_fields(row: List[str]) -> tuple:
+        if len(row) != width:
+            row = (row + padding)[:width]
+        row.append("")
+        return getter(row)
+
+    return get_fields
+
+
+def parse_position_row(fields: tuple) -> Optional[Dict[str, Any]]:
+    """
+    Parse a row's fields (ordered as CSV_COLUMNS) into a position.
+
+    Returns None for rows without ICAO or coordinates.
+    Raises ValueError for malformed values.
+    """
+    timestamp_utc, icao, flight, lat, lon, altitude_ft, speed_kts, heading_deg, squawk = fields
+    if not icao:
+        return None
+
+    # Missing coordinates are only checked for once float() has rejected them
+    try:
+        lat_deg = float(lat)
+        lon_deg = float(lon)
+    except ValueError:
+        if not lat or not lon:
+            return None
+        raise
+
+    return {
+        "timestamp_utc": timestamp_utc,
+        "icao": icao.strip(),
+        "flight": flight.strip(),
+        "lat": lat_deg,
+        "lon": lon_deg,
+        "altitude_ft": int(float(altitude_ft)) if altitude_ft.strip() else None,
+        "speed_kts": float(speed_kts) if speed_kts.strip() else None,
+        "heading_deg": float(heading_deg) if heading_deg.strip() else None,
+        "squawk": squawk.strip(),
+    }
 
-def read_csv_positions(csv_path) -> List[Dict[str, Any]]:
-    """Read positions from a CSV file."""
+
+def read_csv_positions(csv_path, icaos: Optional[set] = None) -> List[Dict[str, Any]]:
+    """
+    Read positions from a CSV file.
+
+    If icaos is given (upper-case ICAO codes), rows of other aircraft are
+    skipped before their values are parsed.
+    """
     positions = []
 
     if not os.path.exists(csv_path):
         print(f"Error: CSV file not found: {csv_path}", file=sys.stderr)
         return positions
 
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return positions
+        get_fields = position_fields_getter(header)
+
         for row_num, row in enumerate(reader, start=2):
+            fields = get_fields(row)
+            if icaos is not None and fields[1].strip().upper() not in icaos:
+                continue
             try:
-                if not row.get("icao") or not row.get("lat") or not row.get("lon"):
-                    continue
-
-                lat = float(row["lat"])
-                lon = float(row["lon"])
-
-                position = {
-                    "timestamp_utc": row.get("timestamp_utc", ""),
-                    "icao": row.get("icao", "").strip(),
-                    "flight": row.get("flight", "").strip(),
-                    "lat": lat,
-                    "lon": lon,
-                    "altitude_ft": int(float(row["altitude_ft"])) if row.get("altitude_ft") and row["altitude_ft"].strip() else None,
-                    "speed_kts": float(row["speed_kts"]) if row.get("speed_kts") and row["speed_kts"].strip() else None,
-                    "heading_deg": float(row["heading_deg"]) if row.get("heading_deg") and row["heading_deg"].strip() else None,
-                    "squawk": row.get("squawk", "").strip(),
-                }
-                positions.append(position)
-            except (ValueError, KeyError) as e:
+                position = parse_position_row(fields)
+                if position:
+                    positions.append(position)
+            except ValueError as e:
                 print(f"Warning: Skipping row {row_num} in {csv_path}: {e}", file=sys.stderr)
                 continue
 
     return positions
 
 
-def calculate_headings_from_trajectory(positions: List[Dict[str, Any]], history_path=None) -> None:
+def dumps_json(obj) -> bytes:
+    """Serialize obj to UTF-8 JSON, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    # Compact separators, matching orjson's output
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def write_file_atomic(path: str, data: bytes) -> None:
+    """Write data to a temporary file and rename it over path, so readers
+    never see a partially written file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def thin_track(coords: List[List[float]], min_spacing_deg: float = TRACK_THIN_DEG) -> List[List[float]]:
+    """
+    Drop interior vertices of a [lon, lat] line closer than min_spacing_deg
+    to the previous kept vertex. The end points are always kept, so lines
+    that meet stay joined.
+    """
+    if len(coords) <= 2:
+        return coords
+
+    thinned = [coords[0]]
+    last_lon, last_lat = coords[0]
+    for i in range(1, len(coords) - 1):
+        lon, lat = coords[i]
+        if abs(lon - last_lon) >= min_spacing_deg or abs(lat - last_lat) >= min_spacing_deg:
+            thinned.append(coords[i])
+            last_lon, last_lat = lon, lat
+    thinned.append(coords[-1])
+    return thinned
+
+
+def iter_tail_lines(path, block: int = 65536):
+    """
+    Yield the lines of a file from last to first.
+
+    Reads fixed-size blocks backwards from the end of the file, so a caller
+    that stops early only touches the tail of a large history CSV.
+    """
+    with open(path, "rb") as f:
+        position = os.fstat(f.fileno()).st_size
+        carry = b""
+        while position > 0:
+            read_size = min(block, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + carry).split(b"\n")
+            # The first piece may continue in the previous block
+            carry = lines[0]
+            for line in reversed(lines[1:]):
+                line = line.rstrip(b"\r")
+                if line:
+                    yield line.decode("utf-8", errors="replace")
+        carry = carry.rstrip(b"\r")
+        if carry:
+            yield carry.decode("utf-8", errors="replace")
+
+
+def merge_trajectories(positions: List[Dict[str, Any]],
+                       historical_positions: List[Dict[str, Any]],
+                       all_aircraft: bool = True) -> None:
+    """
+    Merge historical positions into positions in place, skipping near-duplicates.
+
+    Args:
+        positions: Positions to extend (e.g., current positions)
+        historical_positions: Historical positions to merge in
+        all_aircraft: Merge history of every aircraft, not only those already in positions
+    """
+    current_icaos = set(p["icao"] for p in positions)
+    index = PositionIndex(positions)
+
+    for hist_pos in historical_positions:
+        if all_aircraft or hist_pos["icao"] in current_icaos:
+            if not index.is_duplicate(hist_pos):
+                positions.append(hist_pos)
+                index.add(hist_pos)
+
+
+def group_by_icao(positions: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group positions into per-aircraft lists, keyed by ICAO."""
+    groups = defaultdict(list)
+    for p in positions:
+        groups[p["icao"]].append(p)
+    return groups
+
+
+def calculate_headings_from_trajectory(positions: List[Dict[str, Any]], history_path=None,
+                                       icao_groups: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> None:
     """
     Calculate headings from trajectory for positions without heading data.
     Modifies positions in place.
+
+    icao_groups may pass positions already grouped with group_by_icao();
+    the group lists are sorted in place.
     """
-    # Group positions by ICAO
-    icao_positions = {}
-    for p in positions:
-        icao = p["icao"]
-        if icao not in icao_positions:
-            icao_positions[icao] = []
-        icao_positions[icao].append(p)
+    icao_positions = dict(icao_groups) if icao_groups is not None else group_by_icao(positions)
 
     # For aircraft with only one position, try to load recent historical positions
     if history_path and os.path.exists(history_path):
@@ -100,25 +313,23 @@ def calculate_headings_from_trajectory(positions: List[Dict[str, Any]], history_
 
         if icaos_needing_history:
             try:
-                with open(history_path, "r", encoding="utf-8") as f:
-                    lines = f.readlines()
+                with open(history_path, "r", encoding="utf-8", newline="") as f:
+                    get_fields = position_fields_getter(next(csv.reader(f), []))
 
                 history_positions = {icao: [] for icao in icaos_needing_history}
-                reader = csv.DictReader(lines)
-                all_rows = list(reader)
 
-                for row in reversed(all_rows):
-                    icao = row.get("icao", "").strip()
+                # Walk the history backwards; only the most recent rows are needed
+                for row in csv.reader(iter_tail_lines(history_path)):
+                    timestamp_utc, icao, _, lat, lon = get_fields(row)[:5]
+                    icao = icao.strip()
                     if icao in icaos_needing_history and len(history_positions[icao]) < 5:
                         try:
-                            lat = float(row["lat"])
-                            lon = float(row["lon"])
                             history_positions[icao].append({
-                                "lat": lat,
-                                "lon": lon,
-                                "timestamp_utc": row.get("timestamp_utc", "")
+                                "lat": float(lat),
+                                "lon": float(lon),
+                                "timestamp_utc": timestamp_utc
                             })
-                        except (ValueError, KeyError):
+                        except ValueError:
                             pass
 
                     if all(len(v) >= 2 for v in history_positions.values()):
@@ -134,26 +345,18 @@ def calculate_headings_from_trajectory(positions: List[Dict[str, Any]], history_
 
     # Calculate heading from consecutive positions
     for icao, pos_list in icao_positions.items():
-        pos_list.sort(key=lambda x: x.get("timestamp_utc", ""))
-
-        for i in range(len(pos_list)):
-            if pos_list[i].get("heading_deg") is None:
-                if i > 0:
-                    prev_pos = pos_list[i - 1]
-                    if prev_pos["lat"] != pos_list[i]["lat"] or prev_pos["lon"] != pos_list[i]["lon"]:
-                        heading = calculate_bearing(
-                            prev_pos["lat"], prev_pos["lon"],
-                            pos_list[i]["lat"], pos_list[i]["lon"]
-                        )
-                        pos_list[i]["heading_deg"] = round(heading, 1)
-                elif i < len(pos_list) - 1:
-                    next_pos = pos_list[i + 1]
-                    if next_pos["lat"] != pos_list[i]["lat"] or next_pos["lon"] != pos_list[i]["lon"]:
-                        heading = calculate_bearing(
-                            pos_list[i]["lat"], pos_list[i]["lon"],
-                            next_pos["lat"], next_pos["lon"]
-                        )
-                        pos_list[i]["heading_deg"] = round(heading, 1)
+        pos_list.sort(key=itemgetter("timestamp_utc"))
+        if len(pos_list) < 2 or all(p.get("heading_deg") is not None for p in pos_list):
+            continue
+
+        # bearings[i] points from pos_list[i] to pos_list[i + 1]
+        bearings = calculate_bearings([(p["lat"], p["lon"]) for p in pos_list])
+
+        for i, pos in enumerate(pos_list):
+            if pos.get("heading_deg") is None:
+                other = pos_list[i - 1] if i > 0 else pos_list[1]
+                if other["lat"] != pos["lat"] or other["lon"] != pos["lon"]:
+                    pos["heading_deg"] = round(bearings[i - 1] if i > 0 else bearings[0], 1)
 
 
 def load_svg_icons() -> Dict[str, str]:
@@ -170,6 +373,57 @@ def load_svg_icons() -> Dict[str, str]:
     return svg_icons
 
 
+def get_svg_icons_json() -> str:
+    """Return the SVG icons as JSON, reading the icon files only on first use."""
+    global _svg_icons_json
+    if _svg_icons_json is None:
+        _svg_icons_json = dumps_json(load_svg_icons()).decode("utf-8")
+    return _svg_icons_json
+
+
+# Page styles for aircraft icons and popups
+ICON_CSS = '''
+    <style>
+    .aircraft-icon {
+        background: transparent !important;
+        border: none !important;
+    }
+    .aircraft-icon svg {
+        filter: drop-shadow(1px 1px 1px rgba(0,0,0,0.5));
+    }
+    .leaflet-popup .leaflet-popup-content-wrapper,
+    .leaflet-popup-content-wrapper {
+        background: rgba(0, 0, 0, 0.6) !important;
+        background-color: rgba(0, 0, 0, 0.6) !important;
+        backdrop-filter: blur(20px) saturate(180%) !important;
+        -webkit-backdrop-filter: blur(20px) saturate(180%) !important;
+        border-radius: 14px !important;
+        border: 1px solid rgba(255, 255, 255, 0.15) !important;
+        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.4) !important;
+        color: #fff !important;
+    }
+    .leaflet-popup .leaflet-popup-content,
+    .leaflet-popup-content {
+        margin: 14px 16px !important;
+        min-width: 260px !important;
+        color: #fff !important;
+    }
+    .leaflet-popup .leaflet-popup-tip-container .leaflet-popup-tip,
+    .leaflet-popup-tip {
+        background: rgba(0, 0, 0, 0.6) !important;
+        background-color: rgba(0, 0, 0, 0.6) !important;
+        box-shadow: none !important;
+    }
+    .leaflet-popup-close-button {
+        color: #fff !important;
+    }
+    .leaflet-popup-close-button:hover {
+        color: #ccc !important;
+    }
+    </style>
+    '''
+
+
 def create_map(positions: List[Dict[str, Any]], output_path: str = None,
                title: str = "ADS-B Aircraft Positions", refresh_interval: int = 1,
                current_icaos: Optional[set] = None) -> None:
@@ -199,15 +453,20 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
     print(f"Home location: {home_display_name}")
     print(f"Coordinates: {home_lat}, {home_lon} | Elevation: {home_elevation_m:.0f}m ({home_elevation_ft:.0f}ft)")
 
-    # Calculate bounds to fit all current aircraft
-    latest_positions = {}
-    for p in positions:
-        if current_icaos is None or p["icao"] in current_icaos:
-            icao = p["icao"]
-            if icao not in latest_positions or p.get("timestamp_utc", "") > latest_positions[icao].get("timestamp_utc", ""):
-                latest_positions[icao] = p
+    # Group positions by aircraft once; bounds, tracks, type lookups and the
+    # heading backfill share it. The groups hold copies, so the backfill never
+    # changes the caller's positions (watch_map fingerprints them)
+    icao_groups = group_by_icao([dict(p) for p in positions])
+    by_timestamp = itemgetter("timestamp_utc")
+    for pos_list in icao_groups.values():
+        pos_list.sort(key=by_timestamp)
 
-    current_positions_list = list(latest_positions.values())
+    # Calculate bounds to fit all current aircraft
+    current_positions_list = [
+        pos_list[-1]
+        for icao, pos_list in icao_groups.items()
+        if current_icaos is None or icao in current_icaos
+    ]
     all_lats = [home_lat] + [p["lat"] for p in current_positions_list]
     all_lons = [home_lon] + [p["lon"] for p in current_positions_list]
 
@@ -226,7 +485,10 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
         print("No current aircraft, centering on home")
 
     # Create map
-    m = folium.Map(location=[home_lat, home_lon], zoom_start=10, tiles="OpenStreetMap")
+    # Canvas rendering keeps the write-once archived trajectories in a single
+    # <canvas> instead of one SVG path per segment
+    m = folium.Map(location=[home_lat, home_lon], zoom_start=10, tiles="OpenStreetMap",
+                   prefer_canvas=True)
 
     if bounds:
         m.fit_bounds(bounds)
@@ -258,7 +520,7 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
         icon_anchor=(15, 15),
         class_name='home-marker'
     )
-    home_popup_html = f"<b>Home Position</b><br>{home_display_name}<br><b>Elevation:</b> {home_elevation_ft:.0f} ft ({home_elevation_m:.0f} m)"
+    home_popup_html = f"<b>Home Position</b><br>{escape(home_display_name)}<br><b>Elevation:</b> {home_elevation_ft:.0f} ft ({home_elevation_m:.0f} m)"
     folium.Marker(
         location=[home_lat, home_lon],
         popup=folium.Popup(home_popup_html, max_width=300),
@@ -271,7 +533,9 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
         current_icaos = set()
         try:
             current_time = datetime.now(timezone.utc)
-            for pos in positions:
+            # With no current_icaos the bounds list holds every aircraft's latest
+            # position, so one timestamp per aircraft is parsed instead of every row
+            for pos in current_positions_list:
                 if pos.get("timestamp_utc"):
                     try:
                         pos_time = datetime.fromisoformat(pos["timestamp_utc"].replace('Z', '+00:00'))
@@ -280,129 +544,148 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
                     except:
                         pass
         except:
-            current_icaos = set(p["icao"] for p in positions)
-
-    # Draw trajectory lines for all aircraft
-    icao_groups = {}
-    for pos in positions:
-        icao = pos["icao"]
-        if icao not in icao_groups:
-            icao_groups[icao] = []
-        icao_groups[icao].append(pos)
-
+            current_icaos = set(icao_groups)
+
+    # Draw trajectory lines for archived aircraft once; trajectories of current
+    # aircraft are drawn (and refreshed) by the update script instead.
+    # All tracks go into a single GeoJSON layer, one LineString per run of
+    # consecutive segments sharing an altitude color (rainbow effect).
+    track_features = []
+    track_dots = []
+    # Number of positions per aircraft already in the static layer; the
+    # update script only draws what is appended after them
+    static_track_counts = {}
     for icao, pos_list in icao_groups.items():
-        pos_list_sorted = sorted(pos_list, key=lambda p: p.get("timestamp_utc", ""))
-        latest = pos_list_sorted[-1] if pos_list_sorted else pos_list[0]
-        marker_color = get_altitude_color(latest.get("altitude_ft"))
         is_current = icao in current_icaos if current_icaos else True
 
-        if len(pos_list_sorted) > 1:
+        if len(pos_list) > 1 and icao not in current_icaos:
             line_opacity = 0.6 if is_current else 0.3
-            # Draw each segment with color based on altitude (rainbow effect)
-            for i in range(len(pos_list_sorted) - 1):
-                p1 = pos_list_sorted[i]
-                p2 = pos_list_sorted[i + 1]
+            run_color = None
+            for p1, p2 in zip(pos_list, pos_list[1:]):
                 # Use the altitude at the start of each segment for coloring
                 segment_color = get_altitude_color(p1.get("altitude_ft"))
-                folium.PolyLine(
-                    [[p1["lat"], p1["lon"]], [p2["lat"], p2["lon"]]],
-                    color=segment_color,
-                    weight=3,
-                    opacity=line_opacity,
-                ).add_to(m)
+                if segment_color != run_color:
+                    run_color = segment_color
+                    run_coords = [[p1["lon"], p1["lat"]]]
+                    track_features.append({
+                        "type": "Feature",
+                        "id": len(track_features),
+                        "properties": {"color": segment_color, "opacity": line_opacity},
+                        "geometry": {"type": "LineString", "coordinates": run_coords},
+                    })
+                run_coords.append([p2["lon"], p2["lat"]])
+            static_track_counts[icao] = len(pos_list)
+            latest = pos_list[-1]
+            track_dots.append([round(latest["lat"], 6), round(latest["lon"], 6),
+                               get_altitude_hex_color(latest.get("altitude_ft"))])
+
+    tracks_layer_name = "null"
+    if track_features:
+        for feature in track_features:
+            feature["geometry"]["coordinates"] = thin_track(feature["geometry"]["coordinates"])
+        tracks_layer = folium.GeoJson(
+            {"type": "FeatureCollection", "features": track_features},
+            name="Tracks",
+            style_function=lambda feature: {
+                "color": feature["properties"]["color"],
+                "weight": 3,
+                "opacity": feature["properties"]["opacity"],
+            },
+        ).add_to(m)
+        tracks_layer_name = tracks_layer.get_name()
 
     # Add layer control
     folium.LayerControl().add_to(m)
 
-    # Load aircraft database for type lookup
+    # Look up aircraft types in the shared database, loaded once per process
     aircraft_types = {}
     if AIRCRAFT_DB_AVAILABLE:
-        db = AircraftDatabase()
+        db = get_database()
         if db.load():
-            unique_icaos = set(p["icao"] for p in positions)
-            for icao in unique_icaos:
-                info = db.lookup(icao)
-                if info and info.get("type"):
-                    aircraft_types[icao] = {
+            for icao in icao_groups:
+                if icao not in _aircraft_type_cache:
+                    info = db.lookup(icao)
+                    _aircraft_type_cache[icao] = {
                         "type": info.get("type", ""),
                         "registration": info.get("registration", ""),
                         "model": info.get("model", ""),
                         "manufacturer": info.get("manufacturer", ""),
                         "icon": get_icon_for_type(info.get("type", ""))
-                    }
+                    } if info and info.get("type") else None
+                if _aircraft_type_cache[icao]:
+                    aircraft_types[icao] = _aircraft_type_cache[icao]
 
     # Calculate headings from trajectory
     history_path = get_history_csv_path()
-    calculate_headings_from_trajectory(positions, str(history_path))
+    calculate_headings_from_trajectory(positions, str(history_path), icao_groups)
 
     # Prepare data for JavaScript
-    positions_data = [
-        {
-            "icao": p["icao"],
-            "flight": p.get("flight", ""),
-            "lat": p["lat"],
-            "lon": p["lon"],
-            "altitude_ft": p.get("altitude_ft"),
-            "speed_kts": p.get("speed_kts"),
-            "heading_deg": p.get("heading_deg"),
-            "squawk": p.get("squawk", ""),
-            "timestamp_utc": p.get("timestamp_utc", "")
-        }
-        for p in positions
-    ]
-    positions_json = json.dumps(positions_data)
-    aircraft_types_json = json.dumps(aircraft_types)
-    svg_icons_json = json.dumps(load_svg_icons())
-    current_icaos_json = json.dumps(list(current_icaos) if current_icaos else [])
+    # Positions are emitted grouped by aircraft and in time order, so the page
+    # never has to sort them
+    positions = [p for pos_list in icao_groups.values() for p in pos_list]
+
+    # Altitude colors are computed here once per distinct altitude; positions
+    # carry an index ("ci") into the palette of distinct colors
+    palette_index: Dict[str, int] = {}
+    altitude_ci: Dict[Any, int] = {}
+    for p in positions:
+        altitude_ft = p.get("altitude_ft")
+        if altitude_ft not in altitude_ci:
+            color = get_altitude_hex_color(altitude_ft)
+            altitude_ci[altitude_ft] = palette_index.setdefault(color, len(palette_index))
+
+    # Columnar layout: one array per field instead of one object per position,
+    # so field names are not repeated for every point
+    positions_data = {
+        "palette": list(palette_index),
+        "ci": [altitude_ci[p.get("altitude_ft")] for p in positions],
+        "icao": [p["icao"] for p in positions],
+        "flight": [p.get("flight", "") for p in positions],
+        "lat_e6": [round(p["lat"] * COORD_SCALE) for p in positions],
+        "lon_e6": [round(p["lon"] * COORD_SCALE) for p in positions],
+        "altitude_ft": [p.get("altitude_ft") for p in positions],
+        "speed_kts": [
+            round(p["speed_kts"], 1) if p.get("speed_kts") is not None else None
+            for p in positions
+        ],
+        "heading_e1": [
+            round(p["heading_deg"] * 10) if p.get("heading_deg") is not None else None
+            for p in positions
+        ],
+        "squawk": [p.get("squawk", "") for p in positions],
+        "timestamp_utc": [p.get("timestamp_utc", "") for p in positions],
+        "current": sorted(current_icaos),
+    }
+    # The payload carries a content version so the page can skip unchanged data
+    positions_bytes = dumps_json(positions_data)
+    version = hashlib.blake2b(positions_bytes, digest_size=8).hexdigest()
+    payload_bytes = b'{"version":"' + version.encode("ascii") + b'","positions":' + positions_bytes + b"}"
+    # Embedded in a <script> block, so "</" must not appear literally
+    positions_json_html = payload_bytes.replace(b"</", b"<\\/").decode("utf-8")
+    aircraft_types_json = dumps_json(aircraft_types).decode("utf-8")
+    svg_icons_json = get_svg_icons_json()
+    static_track_counts_json = dumps_json(static_track_counts).decode("utf-8")
+    track_dots_json = dumps_json(track_dots).decode("utf-8")
 
     # Save JSON data file
     json_path = os.path.splitext(output_path)[0] + "_data.json"
     json_filename = os.path.basename(json_path)
-    with open(json_path, "w", encoding="utf-8") as f:
-        f.write(positions_json)
+    # Only rewrite the data files when the payload changed, so their mtime
+    # (and the ETag serve_map.py derives from it) stays put on idle refreshes
+    try:
+        with open(json_path, "rb") as f:
+            data_changed = f.read() != payload_bytes or not os.path.exists(json_path + ".gz")
+    except OSError:
+        data_changed = True
+    if data_changed:
+        gz_bytes = gzip.compress(payload_bytes, compresslevel=6, mtime=0)
+        write_file_atomic(json_path, payload_bytes)
+        # Precompressed copy for serve_map.py, written after the plain file so
+        # it is never older than the data it stands for
+        write_file_atomic(json_path + ".gz", gz_bytes)
 
     # Add CSS
-    icon_css = '''
-    <style>
-    .aircraft-icon {
-        background: transparent !important;
-        border: none !important;
-    }
-    .aircraft-icon svg {
-        filter: drop-shadow(1px 1px 1px rgba(0,0,0,0.5));
-    }
-    .leaflet-popup .leaflet-popup-content-wrapper,
-    .leaflet-popup-content-wrapper {
-        background: rgba(0, 0, 0, 0.6) !important;
-        background-color: rgba(0, 0, 0, 0.6) !important;
-        backdrop-filter: blur(20px) saturate(180%) !important;
-        -webkit-backdrop-filter: blur(20px) saturate(180%) !important;
-        border-radius: 14px !important;
-        border: 1px solid rgba(255, 255, 255, 0.15) !important;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.4) !important;
-        color: #fff !important;
-    }
-    .leaflet-popup .leaflet-popup-content,
-    .leaflet-popup-content {
-        margin: 14px 16px !important;
-        min-width: 260px !important;
-        color: #fff !important;
-    }
-    .leaflet-popup .leaflet-popup-tip-container .leaflet-popup-tip,
-    .leaflet-popup-tip {
-        background: rgba(0, 0, 0, 0.6) !important;
-        background-color: rgba(0, 0, 0, 0.6) !important;
-        box-shadow: none !important;
-    }
-    .leaflet-popup-close-button {
-        color: #fff !important;
-    }
-    .leaflet-popup-close-button:hover {
-        color: #ccc !important;
-    }
-    </style>
-    '''
-    m.get_root().html.add_child(folium.Element(icon_css))
+    m.get_root().html.add_child(folium.Element(ICON_CSS))
 
     # Add title with dark glassmorphism style
     title_html = f'''
@@ -419,7 +702,7 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
                font-size:14px;
                font-weight:normal">
     {title}<br>
-    <span id="map-stats" style="font-size:12px;color:#fff;">Aircraft: {len(set(p["icao"] for p in positions))} | Positions: {len(positions)}</span><br>
+    <span id="map-stats" style="font-size:12px;color:#fff;">Aircraft: {len(icao_groups)} | Positions: {len(positions)}</span><br>
     <span style="font-size:10px;color:rgba(255,255,255,0.6);">Auto-updating every 1s</span>
     </h3>
     '''
@@ -427,15 +710,66 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
 
     # Add JavaScript for dynamic updates
     home_display_name_escaped = home_display_name.replace("'", "\\'")
-    altitude_color_js = get_altitude_color_js()
 
     update_js = f'''
+    <script type="application/json" id="positions-data">{positions_json_html}</script>
     <script>
-    let embeddedPositionsData = {positions_json};
-    let currentICAOs = new Set({current_icaos_json});
+    const COORD_SCALE = {COORD_SCALE};
+
+    // Expand fixed-point values (micro-degree coordinates, headings in tenths
+    // of a degree) back to floating point degrees
+    function decodePositions(columns) {{
+        columns.lat = columns.lat_e6.map(v => v / COORD_SCALE);
+        columns.lon = columns.lon_e6.map(v => v / COORD_SCALE);
+        columns.heading_deg = columns.heading_e1.map(v => v == null ? null : v / 10);
+        columns.length = columns.icao.length;
+        columns.current = new Set(columns.current);
+        return columns;
+    }}
+
+    // Positions are kept as columns; only single positions shown in popups
+    // are materialized as objects
+    function positionAt(data, i) {{
+        return {{
+            icao: data.icao[i],
+            flight: data.flight[i],
+            lat: data.lat[i],
+            lon: data.lon[i],
+            altitude_ft: data.altitude_ft[i],
+            speed_kts: data.speed_kts[i],
+            heading_deg: data.heading_deg[i],
+            squawk: data.squawk[i],
+            timestamp_utc: data.timestamp_utc[i],
+            color: data.palette[data.ci[i]]
+        }};
+    }}
+
+    // The embedded copy of the data is only parsed when the page is opened from
+    // disk; over HTTP the data file is fetched instead
+    const IS_HTTP = window.location.protocol.startsWith('http');
+    let embeddedPositionsData = null;
+    let dataVersion = null;
+    let dataEtag = null;
+    if (!IS_HTTP) {{
+        const payload = JSON.parse(document.getElementById('positions-data').textContent);
+        embeddedPositionsData = decodePositions(payload.positions);
+        dataVersion = payload.version;
+    }}
     let aircraftTypes = {aircraft_types_json};
     const SVG_ICONS = {svg_icons_json};
 
+    // SVG templates split around their {{COLOR}} placeholders
+    const SVG_PARTS = {{}};
+    Object.keys(SVG_ICONS).forEach(name => {{ SVG_PARTS[name] = SVG_ICONS[name].split('{{COLOR}}'); }});
+
+    // Icons are shared between updates and aircraft, keyed by type and color;
+    // headings are applied to each marker's element as a CSS rotation
+    const ICON_CACHE_SIZE = 1024;
+    const iconCache = new Map();
+
+    // Popup rows that never change for an aircraft, built once per ICAO
+    const staticPopupCache = new Map();
+
     const HOME_LOCATION = {{
         lat: {home_lat},
         lon: {home_lon},
@@ -444,15 +778,17 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
         name: '{home_display_name_escaped}'
     }};
 
+    // The home latitude never changes, so its cosine is computed once
+    const HOME_COS_LAT = Math.cos(HOME_LOCATION.lat * Math.PI / 180);
+
     function calculate3DDistance(aircraft_lat, aircraft_lon, aircraft_alt_ft) {{
         const R = 6371.0;
-        const lat1 = HOME_LOCATION.lat * Math.PI / 180;
         const lat2 = aircraft_lat * Math.PI / 180;
         const dlat = (aircraft_lat - HOME_LOCATION.lat) * Math.PI / 180;
         const dlon = (aircraft_lon - HOME_LOCATION.lon) * Math.PI / 180;
 
         const a = Math.sin(dlat / 2) * Math.sin(dlat / 2) +
-                  Math.cos(lat1) * Math.cos(lat2) * Math.sin(dlon / 2) * Math.sin(dlon / 2);
+                  HOME_COS_LAT * Math.cos(lat2) * Math.sin(dlon / 2) * Math.sin(dlon / 2);
         const c = 2 * Math.atan2(Math.sqrt(a), Math.sqrt(1 - a));
         const horizontalDistKm = R * c;
 
@@ -468,14 +804,34 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
         return `${{distanceKm.toFixed(1)}} km`;
     }}
 
-    {altitude_color_js}
-
     let markerLayer = null;
     let lineLayer = null;
-    let currentMarkers = {{}};
-    let currentLines = {{}};
+    // Live trajectories paint into their own canvas; the wider padding keeps
+    // short pans from forcing a full redraw
+    let lineRenderer = null;
+    // Keyed by ICAO
+    const currentMarkers = new Map();
+    const currentLines = new Map();
+    // Per-ICAO snapshot of the last rendered trajectory, so unchanged
+    // aircraft are skipped on refresh
+    const lastHash = new Map();
+    // Positions per aircraft drawn into the static tracks layer at page load
+    const STATIC_TRACK_COUNTS = new Map(Object.entries({static_track_counts_json}));
     let homeMarker = null;
 
+    // Zoomed out, archived tracks collapse to a dot at each aircraft's last
+    // position; the dots live inside the tracks layer so the layer control
+    // still toggles them together
+    const TRACK_DOT_MAX_ZOOM = {TRACK_DOT_MAX_ZOOM};
+    const TRACK_DOTS = {track_dots_json};
+    let trackLines = null;
+    let trackDots = null;
+    let tracksAsDots = false;
+
+    const UPDATE_INTERVAL_MS = 1000;
+    let updateTimer = null;
+    let updating = false;
+
     (function initializeMap() {{
         function findMap() {{
             let mapObj = null;
@@ -499,9 +855,13 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
 
                 markerLayer = L.featureGroup();
                 lineLayer = L.featureGroup();
+                lineRenderer = L.canvas({{ padding: 0.5 }});
                 mapObj.addLayer(markerLayer);
                 mapObj.addLayer(lineLayer);
 
+                mapObj.on('zoomend', () => updateTrackDetail(mapObj));
+                updateTrackDetail(mapObj);
+
                 const homeLat = {home_lat};
                 const homeLon = {home_lon};
                 if (homeLat && homeLon) {{
@@ -515,7 +875,7 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
                     mapObj.addLayer(homeMarker);
                 }}
 
-                updateMarkers(embeddedPositionsData);
+                if (!IS_HTTP) updateMarkers(embeddedPositionsData);
                 startAutoUpdate();
             }} else {{
                 setTimeout(findMap, 100);
@@ -549,36 +909,183 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
         return aircraftTypes[icao] || null;
     }}
 
-    function createSvgIcon(icao, altitude_ft, heading_deg) {{
+    function iconKey(icao, color) {{
         const iconType = getAircraftIconType(icao);
-        const color = getAltitudeColor(altitude_ft);
-        const rotation = heading_deg !== null && heading_deg !== undefined ? heading_deg : 0;
-        let svg = (SVG_ICONS[iconType] || SVG_ICONS['plane']).replace(/\\{{COLOR\\}}/g, color);
-        const html = `<div style="transform: rotate(${{rotation}}deg); transform-origin: center center;">${{svg}}</div>`;
-        return L.divIcon({{ html: html, className: 'aircraft-icon', iconSize: [28, 28], iconAnchor: [14, 14], popupAnchor: [0, -14] }});
+        return (SVG_PARTS[iconType] ? iconType : 'plane') + '|' + color;
     }}
 
-    function startAutoUpdate() {{
-        const isHttp = window.location.protocol.startsWith('http');
-        if (isHttp) {{
-            updateMapData();
-            setInterval(updateMapData, 1000);
-        }} else {{
-            setInterval(() => updateMarkers(embeddedPositionsData), 1000);
+    function createSvgIcon(key) {{
+        let icon = iconCache.get(key);
+        if (!icon) {{
+            const [iconType, color] = key.split('|');
+            const svg = SVG_PARTS[iconType].join(color);
+            const html = `<div class="aircraft-heading" style="transform-origin: center center;">${{svg}}</div>`;
+            icon = L.divIcon({{ html: html, className: 'aircraft-icon', iconSize: [28, 28], iconAnchor: [14, 14], popupAnchor: [0, -14] }});
+            if (iconCache.size >= ICON_CACHE_SIZE) iconCache.clear();
+            iconCache.set(key, icon);
         }}
+        return icon;
     }}
 
-    function updateMapData() {{
-        fetch('{json_filename}?t=' + new Date().getTime())
-            .then(r => r.json())
-            .then(data => {{
-                embeddedPositionsData = data;
+    // Rotate the marker's existing icon element instead of replacing the icon
+    function applyHeading(marker) {{
+        const el = marker.getElement();
+        const inner = el && el.querySelector('.aircraft-heading');
+        if (inner) inner.style.transform = `rotate(${{marker._heading}}deg)`;
+    }}
+
+    function setMarkerIcon(marker, key, heading_deg) {{
+        const heading = heading_deg !== null && heading_deg !== undefined ? heading_deg : 0;
+        if (marker._iconKey !== key) {{
+            marker._iconKey = key;
+            marker._heading = heading;
+            marker.setIcon(createSvgIcon(key));
+            applyHeading(marker);
+        }} else if (marker._heading !== heading) {{
+            marker._heading = heading;
+            applyHeading(marker);
+        }}
+    }}
+
+    function updateTrackDetail(mapObj) {{
+        const tracksLayer = window['{tracks_layer_name}'];
+        if (!tracksLayer) return;
+        const showDots = mapObj.getZoom() <= TRACK_DOT_MAX_ZOOM;
+        if (showDots === tracksAsDots) return;
+        if (!trackDots) {{
+            trackLines = tracksLayer.getLayers();
+            trackDots = TRACK_DOTS.map(d => L.circleMarker([d[0], d[1]], {{
+                renderer: lineRenderer, radius: 3, weight: 1, color: d[2], opacity: 0.6, fillOpacity: 0.6
+            }}));
+        }}
+        (showDots ? trackLines : trackDots).forEach(l => tracksLayer.removeLayer(l));
+        (showDots ? trackDots : trackLines).forEach(l => tracksLayer.addLayer(l));
+        tracksAsDots = showDots;
+    }}
+
+    // Each refresh is scheduled only after the previous one has been drawn,
+    // so slow fetches or a busy tab never stack updates; polling stops while
+    // the tab is hidden and resumes when it becomes visible again
+    function startAutoUpdate() {{
+        document.addEventListener('visibilitychange', () => {{
+            if (!document.hidden) scheduleUpdate(0);
+        }});
+        scheduleUpdate(IS_HTTP ? 0 : UPDATE_INTERVAL_MS);
+    }}
+
+    function scheduleUpdate(delay) {{
+        if (updateTimer === null && !updating) updateTimer = setTimeout(runUpdate, delay);
+    }}
+
+    function runUpdate() {{
+        updateTimer = null;
+        if (document.hidden) return;
+        updating = true;
+        const done = IS_HTTP ? updateMapData() : renderMarkers(embeddedPositionsData);
+        done.finally(() => {{
+            updating = false;
+            scheduleUpdate(UPDATE_INTERVAL_MS);
+        }});
+    }}
+
+    // Apply marker changes on the next animation frame, in step with Leaflet
+    function renderMarkers(data) {{
+        return new Promise(resolve => requestAnimationFrame(() => {{
+            try {{
                 updateMarkers(data);
+            }} finally {{
+                resolve();
+            }}
+        }}));
+    }}
+
+    function updateMapData() {{
+        // Revalidate with the last ETag instead of cache-busting; an unchanged
+        // file comes back as an empty 304. The browser cache is bypassed so
+        // the 304 reaches this code rather than being replayed as a 200
+        const headers = dataEtag ? {{ 'If-None-Match': dataEtag }} : {{}};
+        return fetch('{json_filename}', {{ cache: 'no-store', headers: headers }})
+            .then(r => {{
+                if (r.status === 304) return null;
+                // Only remember the ETag once its body has parsed, so a bad
+                // response is fetched again in full on the next poll
+                const etag = r.headers.get('ETag');
+                return r.json().then(payload => {{
+                    dataEtag = etag;
+                    return payload;
+                }});
+            }})
+            .then(payload => {{
+                // Servers without ETags resend the same data; skip it by version
+                if (!payload || payload.version === dataVersion) return;
+                dataVersion = payload.version;
+                embeddedPositionsData = decodePositions(payload.positions);
+                return renderMarkers(embeddedPositionsData);
             }})
             .catch(e => console.log('Update failed:', e));
     }}
 
-    function updateMarkers(positions) {{
+    // Values from the CSV and aircraft database are inserted into popup HTML
+    const HTML_ESCAPES = {{ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }};
+    function escapeHtml(value) {{
+        return String(value).replace(/[&<>"']/g, c => HTML_ESCAPES[c]);
+    }}
+
+    // Database rows (registration, type, model) and the tracking links only
+    // depend on the ICAO
+    function getStaticPopupParts(icao) {{
+        let parts = staticPopupCache.get(icao);
+        if (parts) return parts;
+        const acInfo = getAircraftInfo(icao);
+        let info = '';
+        if (acInfo && acInfo.registration) info += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Registration</td><td style="padding: 2px 0; color: #fff;">${{escapeHtml(acInfo.registration)}}</td></tr>`;
+        if (acInfo && acInfo.type) info += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Type</td><td style="padding: 2px 0; color: #fff;">${{escapeHtml(acInfo.type)}}</td></tr>`;
+        if (acInfo && acInfo.model) info += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Model</td><td style="padding: 2px 0; color: #fff;">${{escapeHtml(acInfo.model)}}</td></tr>`;
+        let links = `<a href="https://globe.adsbexchange.com/?icao=${{encodeURIComponent(icao.toLowerCase())}}" target="_blank" style="color:#6cb8ff; text-decoration:none; margin-right: 12px;">ADSBexchange</a>`;
+        if (acInfo && acInfo.registration) {{
+            links += `<a href="https://www.flightradar24.com/data/aircraft/${{encodeURIComponent(acInfo.registration.toLowerCase())}}" target="_blank" style="color:#6cb8ff; text-decoration:none;">FlightRadar24</a>`;
+        }}
+        parts = {{ info: info, links: links }};
+        staticPopupCache.set(icao, parts);
+        return parts;
+    }}
+
+    function buildPopup(latest) {{
+        const parts = getStaticPopupParts(latest.icao);
+
+        // Build popup with three sections
+        let popup = '<div style="font-family: -apple-system, BlinkMacSystemFont, sans-serif; font-size: 13px;">';
+
+        // Section 1: Aircraft Data (static info)
+        popup += '<table style="width: 100%; border-collapse: collapse; margin-bottom: 8px; table-layout: fixed;">';
+        popup += `<tr><td style="width: 50%; padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">ICAO</td><td style="width: 50%; padding: 2px 0; font-weight: 600; color: #fff;">${{escapeHtml(latest.icao)}}</td></tr>`;
+        if (latest.flight) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Flight</td><td style="padding: 2px 0; font-weight: 600; color: #fff;">${{escapeHtml(latest.flight)}}</td></tr>`;
+        popup += parts.info;
+        popup += '</table>';
+
+        // Divider
+        popup += '<hr style="border: none; border-top: 1px solid rgba(255,255,255,0.2); margin: 6px 0;">';
+
+        // Section 2: Live Data (dynamic info)
+        popup += '<table style="width: 100%; border-collapse: collapse; margin-bottom: 8px; table-layout: fixed;">';
+        if (latest.timestamp_utc) popup += `<tr><td style="width: 50%; padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Spotted</td><td style="width: 50%; padding: 2px 0; color: #fff;">${{formatTimeAgo(latest.timestamp_utc)}}</td></tr>`;
+        popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Distance</td><td style="padding: 2px 0; color: #fff;">${{formatDistance(calculate3DDistance(latest.lat, latest.lon, latest.altitude_ft))}}</td></tr>`;
+        if (latest.altitude_ft) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Altitude</td><td style="padding: 2px 0; color: #fff;">${{latest.altitude_ft.toLocaleString()}} ft <span style="color:rgba(255,255,255,0.5);">(${{Math.round(latest.altitude_ft * 0.3048).toLocaleString()}} m)</span></td></tr>`;
+        if (latest.speed_kts) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Speed</td><td style="padding: 2px 0; color: #fff;">${{Math.round(latest.speed_kts)}} kts <span style="color:rgba(255,255,255,0.5);">(${{Math.round(latest.speed_kts * 1.852)}} km/h)</span></td></tr>`;
+        if (latest.heading_deg != null) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Heading</td><td style="padding: 2px 0; color: #fff;">${{Math.round(latest.heading_deg)}}°</td></tr>`;
+        if (latest.squawk) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Squawk</td><td style="padding: 2px 0; color: #fff;">${{escapeHtml(latest.squawk)}}</td></tr>`;
+        popup += '</table>';
+
+        // Section 3: Tracking Links
+        popup += '<hr style="border: none; border-top: 1px solid rgba(255,255,255,0.2); margin: 6px 0;">';
+        popup += '<div style="text-align: center; padding-top: 2px;">';
+        popup += parts.links;
+        popup += '</div>';
+        popup += '</div>';
+        return popup;
+    }}
+
+    function updateMarkers(data) {{
         if (!markerLayer || !lineLayer) return;
 
         const mapObj = markerLayer._map;
@@ -586,91 +1093,99 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
             mapObj.addLayer(homeMarker);
         }}
 
-        const icaoGroups = {{}};
-        positions.forEach(pos => {{
-            if (!icaoGroups[pos.icao]) icaoGroups[pos.icao] = [];
-            icaoGroups[pos.icao].push(pos);
-        }});
+        // Archived trajectories present at page load are rendered once into
+        // the static tracks layer; only positions added since are drawn here
+        // Groups hold row indices into the data columns, already in time order
+        const currentICAOs = data.current;
+        const icaoGroups = new Map();
+        for (let i = 0; i < data.length; i++) {{
+            const icao = data.icao[i];
+            const group = icaoGroups.get(icao);
+            if (group) group.push(i);
+            else icaoGroups.set(icao, [i]);
+        }}
 
         const statsEl = document.getElementById('map-stats');
         if (statsEl) {{
-            statsEl.textContent = `Aircraft: ${{Object.keys(icaoGroups).length}} | Positions: ${{positions.length}} | Current: ${{currentICAOs.size}}`;
+            statsEl.textContent = `Aircraft: ${{icaoGroups.size}} | Positions: ${{data.length}} | Current: ${{currentICAOs.size}}`;
         }}
 
-        Object.keys(currentMarkers).forEach(icao => {{
+        currentMarkers.forEach((marker, icao) => {{
             if (!currentICAOs.has(icao)) {{
-                markerLayer.removeLayer(currentMarkers[icao]);
-                delete currentMarkers[icao];
+                markerLayer.removeLayer(marker);
+                currentMarkers.delete(icao);
             }}
         }});
 
-        lineLayer.clearLayers();
-        currentLines = {{}};
+        currentLines.forEach((lines, icao) => {{
+            if (!icaoGroups.has(icao)) {{
+                lines.segments.forEach(segment => lineLayer.removeLayer(segment));
+                currentLines.delete(icao);
+                lastHash.delete(icao);
+            }}
+        }});
 
-        Object.keys(icaoGroups).forEach(icao => {{
-            const posList = icaoGroups[icao].sort((a, b) => (a.timestamp_utc || '').localeCompare(b.timestamp_utc || ''));
-            const latest = posList[posList.length - 1];
-            const color = getAltitudeColor(latest.altitude_ft);
+        icaoGroups.forEach((posList, icao) => {{
+            const last = posList[posList.length - 1];
             const isCurrent = currentICAOs.has(icao);
 
-            if (isCurrent) {{
-                const acInfo = getAircraftInfo(icao);
-
-                // Build popup with three sections
-                let popup = '<div style="font-family: -apple-system, BlinkMacSystemFont, sans-serif; font-size: 13px;">';
-
-                // Section 1: Aircraft Data (static info)
-                popup += '<table style="width: 100%; border-collapse: collapse; margin-bottom: 8px; table-layout: fixed;">';
-                popup += `<tr><td style="width: 50%; padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">ICAO</td><td style="width: 50%; padding: 2px 0; font-weight: 600; color: #fff;">${{latest.icao}}</td></tr>`;
-                if (latest.flight) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Flight</td><td style="padding: 2px 0; font-weight: 600; color: #fff;">${{latest.flight}}</td></tr>`;
-                if (acInfo && acInfo.registration) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Registration</td><td style="padding: 2px 0; color: #fff;">${{acInfo.registration}}</td></tr>`;
-                if (acInfo && acInfo.type) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Type</td><td style="padding: 2px 0; color: #fff;">${{acInfo.type}}</td></tr>`;
-                if (acInfo && acInfo.model) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Model</td><td style="padding: 2px 0; color: #fff;">${{acInfo.model}}</td></tr>`;
-                popup += '</table>';
-
-                // Divider
-                popup += '<hr style="border: none; border-top: 1px solid rgba(255,255,255,0.2); margin: 6px 0;">';
-
-                // Section 2: Live Data (dynamic info)
-                popup += '<table style="width: 100%; border-collapse: collapse; margin-bottom: 8px; table-layout: fixed;">';
-                if (latest.timestamp_utc) popup += `<tr><td style="width: 50%; padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Spotted</td><td style="width: 50%; padding: 2px 0; color: #fff;">${{formatTimeAgo(latest.timestamp_utc)}}</td></tr>`;
-                popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Distance</td><td style="padding: 2px 0; color: #fff;">${{formatDistance(calculate3DDistance(latest.lat, latest.lon, latest.altitude_ft))}}</td></tr>`;
-                if (latest.altitude_ft) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Altitude</td><td style="padding: 2px 0; color: #fff;">${{latest.altitude_ft.toLocaleString()}} ft <span style="color:rgba(255,255,255,0.5);">(${{Math.round(latest.altitude_ft * 0.3048).toLocaleString()}} m)</span></td></tr>`;
-                if (latest.speed_kts) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Speed</td><td style="padding: 2px 0; color: #fff;">${{Math.round(latest.speed_kts)}} kts <span style="color:rgba(255,255,255,0.5);">(${{Math.round(latest.speed_kts * 1.852)}} km/h)</span></td></tr>`;
-                if (latest.heading_deg != null) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Heading</td><td style="padding: 2px 0; color: #fff;">${{Math.round(latest.heading_deg)}}°</td></tr>`;
-                if (latest.squawk) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Squawk</td><td style="padding: 2px 0; color: #fff;">${{latest.squawk}}</td></tr>`;
-                popup += '</table>';
-
-                // Section 3: Tracking Links
-                popup += '<hr style="border: none; border-top: 1px solid rgba(255,255,255,0.2); margin: 6px 0;">';
-                popup += '<div style="text-align: center; padding-top: 2px;">';
-                popup += `<a href="https://globe.adsbexchange.com/?icao=${{latest.icao.toLowerCase()}}" target="_blank" style="color:#6cb8ff; text-decoration:none; margin-right: 12px;">ADSBexchange</a>`;
-                if (acInfo && acInfo.registration) {{
-                    popup += `<a href="https://www.flightradar24.com/data/aircraft/${{acInfo.registration.toLowerCase()}}" target="_blank" style="color:#6cb8ff; text-decoration:none;">FlightRadar24</a>`;
-                }}
-                popup += '</div>';
-                popup += '</div>';
+            const h = (isCurrent ? 'c|' : 'a|') + posList.length + '|' + data.lat[last] + '|' + data.lon[last] + '|' +
+                      data.altitude_ft[last] + '|' + data.heading_deg[last] + '|' + data.timestamp_utc[last];
+            const marker = currentMarkers.get(icao);
+            if (lastHash.get(icao) === h) {{
+                // Keep the relative "Spotted" time fresh on an open popup
+                if (marker && marker.isPopupOpen()) marker.getPopup().update();
+                return;
+            }}
+            lastHash.set(icao, h);
+            const latest = positionAt(data, last);
 
-                if (currentMarkers[icao]) {{
-                    currentMarkers[icao].setLatLng([latest.lat, latest.lon]);
-                    currentMarkers[icao].setPopupContent(popup);
-                    currentMarkers[icao].setIcon(createSvgIcon(icao, latest.altitude_ft, latest.heading_deg));
+            if (isCurrent) {{
+                // Popups are built from the marker's latest position when opened
+                if (marker) {{
+                    marker._latest = latest;
+                    marker.setLatLng([latest.lat, latest.lon]);
+                    if (marker.isPopupOpen()) marker.getPopup().update();
+                    setMarkerIcon(marker, iconKey(icao, latest.color), latest.heading_deg);
                 }} else {{
-                    const marker = L.marker([latest.lat, latest.lon], {{ icon: createSvgIcon(icao, latest.altitude_ft, latest.heading_deg) }}).bindPopup(popup);
-                    markerLayer.addLayer(marker);
-                    currentMarkers[icao] = marker;
+                    const key = iconKey(icao, latest.color);
+                    const newMarker = L.marker([latest.lat, latest.lon], {{ icon: createSvgIcon(key) }});
+                    newMarker._latest = latest;
+                    newMarker.bindPopup(m => buildPopup(m._latest));
+                    newMarker._iconKey = key;
+                    newMarker._heading = latest.heading_deg !== null && latest.heading_deg !== undefined ? latest.heading_deg : 0;
+                    // Leaflet builds a fresh icon element whenever the marker is (re)added
+                    newMarker.on('add', () => applyHeading(newMarker));
+                    markerLayer.addLayer(newMarker);
+                    currentMarkers.set(icao, newMarker);
                 }}
             }}
 
-            if (posList.length > 1) {{
+            // Trajectories normally only grow, so keep the drawn segments and
+            // append the new ones; anything else redraws this aircraft only
+            let lines = currentLines.get(icao);
+            if (lines && !(posList.length >= lines.count &&
+                           data.lat[posList[lines.count - 1]] === lines.lastLat &&
+                           data.lon[posList[lines.count - 1]] === lines.lastLon)) {{
+                lines.segments.forEach(segment => lineLayer.removeLayer(segment));
+                lines = null;
+            }}
+            if (!lines) lines = {{ segments: [], count: STATIC_TRACK_COUNTS.get(icao) || 1 }};
+
+            const lineOpacity = isCurrent ? 0.6 : 0.3;
+            if (lines.opacity !== lineOpacity) {{
+                lines.segments.forEach(segment => segment.setStyle({{ opacity: lineOpacity }}));
+                lines.opacity = lineOpacity;
+            }}
+            if (posList.length > lines.count) {{
                 // Draw each segment with color based on altitude (rainbow effect)
-                const lineOpacity = isCurrent ? 0.6 : 0.3;
-                const segments = [];
-                for (let i = 0; i < posList.length - 1; i++) {{
-                    const p1 = posList[i];
-                    const p2 = posList[i + 1];
-                    const segmentColor = getAltitudeColor(p1.altitude_ft);
-                    const segment = L.polyline([[p1.lat, p1.lon], [p2.lat, p2.lon]], {{
+                const segments = lines.segments;
+                for (let i = lines.count - 1; i < posList.length - 1; i++) {{
+                    const i1 = posList[i];
+                    const i2 = posList[i + 1];
+                    const segmentColor = data.palette[data.ci[i1]];
+                    const segment = L.polyline([[data.lat[i1], data.lon[i1]], [data.lat[i2], data.lon[i2]]], {{
+                        renderer: lineRenderer,
                         color: segmentColor,
                         weight: 3,
                         opacity: lineOpacity
@@ -678,8 +1193,11 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
                     lineLayer.addLayer(segment);
                     segments.push(segment);
                 }}
-                currentLines[icao] = segments;
             }}
+            lines.count = posList.length;
+            lines.lastLat = data.lat[last];
+            lines.lastLon = data.lon[last];
+            currentLines.set(icao, lines);
         }});
     }}
     </script>
@@ -752,42 +1270,32 @@ Examples:
     else:
         output_path = str(DEFAULT_CURRENT_MAP_HTML) if args.csv else str(DEFAULT_MAP_HTML)
 
-    # Read positions
+    # Read positions, skipping other aircraft early when filtering by ICAO
+    icao_filter = {args.icao.upper()} if args.icao else None
     print(f"Reading positions from: {csv_path}")
-    positions = read_csv_positions(csv_path)
+    positions = read_csv_positions(csv_path, icao_filter)
 
     # Merge historical trajectories if applicable
     if historical_csv_path and os.path.exists(historical_csv_path) and not args.historical:
         print(f"Loading historical trajectories from: {historical_csv_path}")
-        historical_positions = read_csv_positions(historical_csv_path)
+        show_all_history = not args.csv
+        # Without full history only aircraft already in positions are merged
+        history_icaos = icao_filter
+        if not show_all_history:
+            history_icaos = {p["icao"].upper() for p in positions}
+        historical_positions = read_csv_positions(historical_csv_path, history_icaos)
 
         if historical_positions:
-            current_icaos = set(p["icao"] for p in positions)
-            show_all_history = not args.csv
-
-            for hist_pos in historical_positions:
-                if show_all_history or hist_pos["icao"] in current_icaos:
-                    is_duplicate = any(
-                        p["icao"] == hist_pos["icao"] and
-                        abs(p["lat"] - hist_pos["lat"]) < 0.0001 and
-                        abs(p["lon"] - hist_pos["lon"]) < 0.0001
-                        for p in positions
-                    )
-                    if not is_duplicate:
-                        positions.append(hist_pos)
+            merge_trajectories(positions, historical_positions, all_aircraft=show_all_history)
 
             print(f"Loaded {len(historical_positions)} historical positions")
 
     if not positions:
-        print("No positions found.", file=sys.stderr)
-        sys.exit(1)
-
-    # Filter by ICAO if specified
-    if args.icao:
-        positions = [p for p in positions if p["icao"].upper() == args.icao.upper()]
-        if not positions:
+        if args.icao:
             print(f"No positions found for ICAO: {args.icao}", file=sys.stderr)
-            sys.exit(1)
+        else:
+            print("No positions found.", file=sys.stderr)
+        sys.exit(1)
 
     # Generate title
     if args.title:
@@ -807,16 +1315,17 @@ Examples:
             current_only = read_csv_positions(str(current_csv_path))
             current_icaos_for_map = set(p["icao"] for p in current_only)
 
-            # Ensure current positions are in the data
-            for icao, current_pos in {p["icao"]: p for p in current_only}.items():
-                is_duplicate = any(
-                    p["icao"] == icao and
-                    abs(p["lat"] - current_pos["lat"]) < 0.0001 and
-                    abs(p["lon"] - current_pos["lon"]) < 0.0001
-                    for p in positions
-                )
-                if not is_duplicate:
-                    positions.insert(0, current_pos)
+            # Ensure current positions are in the data; missing ones are
+            # prepended in a single step (newest first, as before)
+            index = PositionIndex(positions)
+            missing = []
+            for current_pos in {p["icao"]: p for p in current_only}.values():
+                if not index.is_duplicate(current_pos):
+                    missing.append(current_pos)
+                    index.add(current_pos)
+            if missing:
+                missing.reverse()
+                positions = missing + positions
 
     # Set home position from args
     if args.home_lat and args.home_lon:
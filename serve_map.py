@@ -10,12 +10,29 @@ Usage:
 """
 
 import argparse
+import email.utils
+import gzip
 import http.server
-import socketserver
+import io
+import os
 import sys
 
 from src.lib.config import OUTPUT_DIR
 
+# Text files served gzip-compressed to clients that accept it
+GZIP_SUFFIXES = (".html", ".json", ".csv")
+
+# Larger files (e.g. a long history CSV) are sent as-is rather than
+# compressed in memory
+GZIP_MAX_BYTES = 8 * 1024 * 1024
+
+# Output files change every second or so; let browsers reuse a response only
+# briefly before revalidating it
+CACHE_CONTROL = "max-age=1"
+
+# Files compressed on the fly, keyed by path: ((mtime_ns, size), gzipped bytes)
+_gzip_cache = {}
+
 
 class CORSRequestHandler(http.server.SimpleHTTPRequestHandler):
     """HTTP request handler with CORS headers."""
@@ -30,6 +47,107 @@ class CORSRequestHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         super().end_headers()
 
+    def send_head(self):
+        # Map pages, data files and CSVs are polled repeatedly: answer an
+        # unchanged file with 304, and send it gzipped when the client accepts it
+        path = self.translate_path(self.path)
+        if not path.endswith(GZIP_SUFFIXES):
+            return super().send_head()
+        try:
+            st = os.stat(path)
+        except OSError:
+            return super().send_head()
+
+        etag = f'W/"{st.st_size:x}-{st.st_mtime_ns:x}"'
+        if self._not_modified(etag, st):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", CACHE_CONTROL)
+            self.end_headers()
+            return None
+
+        encoding = None
+        body = None
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = self._open_gzipped(path, st)
+            if body is not None:
+                encoding = "gzip"
+        if body is None:
+            try:
+                f = open(path, "rb")
+            except OSError:
+                return super().send_head()
+            body = (f, os.fstat(f.fileno()).st_size)
+
+        f, length = body
+        self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(path))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Last-Modified", self.date_time_string(st.st_mtime))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", CACHE_CONTROL)
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        return f
+
+    def _not_modified(self, etag, st):
+        """Check the request's validators; If-None-Match takes precedence."""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return etag in tags or "*" in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            if since.tzinfo is None:
+                return False
+            # Last-Modified has one-second resolution
+            return int(st.st_mtime) <= since.timestamp()
+        return False
+
+    @staticmethod
+    def _open_gzipped(path, st):
+        """
+        Return (file object, length) of the gzipped file, or None.
+
+        Prefers an up-to-date precompressed <path>.gz written by the producer
+        (e.g. the map data file); otherwise compresses small files in memory,
+        reusing the result until the file changes.
+        """
+        try:
+            f = open(path + ".gz", "rb")
+        except OSError:
+            pass
+        else:
+            gz_st = os.fstat(f.fileno())
+            if gz_st.st_mtime_ns >= st.st_mtime_ns:
+                return f, gz_st.st_size
+            f.close()
+
+        if st.st_size > GZIP_MAX_BYTES:
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        cached = _gzip_cache.get(path)
+        if cached is None or cached[0] != signature:
+            try:
+                with open(path, "rb") as src:
+                    cached = (signature, gzip.compress(src.read(), compresslevel=6))
+            except OSError:
+                return None
+            _gzip_cache[path] = cached
+        return io.BytesIO(cached[1]), len(cached[1])
+
+    def copyfile(self, source, outputfile):
+        # Hand the file to the kernel (os.sendfile) instead of copying it
+        # through Python buffers; socket.sendfile falls back to send()
+        outputfile.flush()
+        self.connection.sendfile(source)
+
     def do_OPTIONS(self):
         self.send_response(200)
         self.end_headers()
@@ -57,7 +175,9 @@ Examples:
     args = parser.parse_args()
 
     try:
-        with socketserver.TCPServer((args.host, args.port), CORSRequestHandler) as httpd:
+        # Threaded, so a slow client (or a large CSV download) does not hold up
+        # the map's once-per-second data polling
+        with http.server.ThreadingHTTPServer((args.host, args.port), CORSRequestHandler) as httpd:
             print(f"Serving ADS-B map files from: {OUTPUT_DIR}")
             print(f"Server running at http://{args.host}:{args.port}")
             print(f"Open http://{args.host}:{args.port}/adsb_map.html in your browser")
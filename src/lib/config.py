@@ -27,6 +27,7 @@ DEFAULT_CURRENT_CSV = OUTPUT_DIR / "adsb_current.csv"
 DEFAULT_MAP_HTML = OUTPUT_DIR / "adsb_map.html"
 DEFAULT_CURRENT_MAP_HTML = OUTPUT_DIR / "adsb_current_map.html"
 HOME_CONFIG_FILE = CONFIG_DIR / "home_location.json"
+GEO_CACHE_FILE = CONFIG_DIR / "geo_cache.json"
 AIRCRAFT_DB_FILE = DATA_DIR / "aircraft_db.csv"
 
 # Environment variable overrides
@@ -53,6 +54,7 @@ def get_dump1090_port() -> int:
 # Timing defaults
 RECONNECT_DELAY = 5  # seconds
 FLUSH_INTERVAL = 10  # flush CSV every N records
+FLUSH_MAX_DELAY = 1.0  # ...or at least once per N seconds
 CURRENT_UPDATE_INTERVAL = 5  # update current CSV every N new positions
 CURRENT_MAX_AGE_SECONDS = 60  # only show aircraft seen in last N seconds
 
@@ -13,15 +13,57 @@ import json
 import math
 import os
 import sys
-from typing import Optional
+import threading
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Sequence, Tuple
 import urllib.request
 import urllib.parse
 
-from .config import HOME_CONFIG_FILE
+from .config import HOME_CONFIG_FILE, GEO_CACHE_FILE
 
 
-# Cache for home location
-_cached_home_location = None
+# Cache for home location, resolved once per process and shared read-only
+_cached_home_location: Optional[Mapping] = None
+_home_location_lock = threading.Lock()
+
+# One opener for the geocoding and elevation APIs, built once with the
+# User-Agent Nominatim requires
+_http_opener = urllib.request.build_opener()
+_http_opener.addheaders = [('User-Agent', 'ADS-B Tracker/1.0 (personal use)')]
+
+# Geocoding and elevation results persisted in GEO_CACHE_FILE, so repeat
+# lookups skip the remote APIs (loaded on first use)
+_geo_cache: Optional[dict] = None
+
+
+def _load_geo_cache() -> dict:
+    """Return the lookup cache, reading it from disk on first use."""
+    global _geo_cache
+    if _geo_cache is None:
+        try:
+            with open(GEO_CACHE_FILE, 'r') as f:
+                _geo_cache = json.load(f)
+        except (OSError, ValueError):
+            _geo_cache = {}
+    return _geo_cache
+
+
+def _store_geo_cache(key: str, value) -> None:
+    """Add a lookup result to the cache and write it back to disk."""
+    cache = _load_geo_cache()
+    cache[key] = value
+    try:
+        GEO_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(GEO_CACHE_FILE, 'w') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        print(f"Warning: Could not save geo cache: {e}", file=sys.stderr)
+
+
+def _fetch_json(url: str):
+    """GET a URL through the shared opener and decode its JSON body."""
+    with _http_opener.open(url, timeout=10) as response:
+        return json.loads(response.read().decode())
 
 
 def geocode_address(address: str) -> Optional[dict]:
@@ -34,23 +76,25 @@ def geocode_address(address: str) -> Optional[dict]:
     Returns:
         dict with lat, lon, display_name or None if failed
     """
+    cache_key = "geocode:" + " ".join(address.lower().split())
+    cached = _load_geo_cache().get(cache_key)
+    if cached:
+        return dict(cached)
+
     try:
         encoded_address = urllib.parse.quote(address)
         url = f"https://nominatim.openstreetmap.org/search?q={encoded_address}&format=json&limit=1"
 
-        req = urllib.request.Request(url, headers={
-            'User-Agent': 'ADS-B Tracker/1.0 (personal use)'
-        })
-
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            if data and len(data) > 0:
-                result = data[0]
-                return {
-                    'lat': float(result['lat']),
-                    'lon': float(result['lon']),
-                    'display_name': result.get('display_name', address)
-                }
+        data = _fetch_json(url)
+        if data and len(data) > 0:
+            result = data[0]
+            location = {
+                'lat': float(result['lat']),
+                'lon': float(result['lon']),
+                'display_name': result.get('display_name', address)
+            }
+            _store_geo_cache(cache_key, location)
+            return dict(location)
     except Exception as e:
         print(f"Geocoding failed: {e}", file=sys.stderr)
 
@@ -70,17 +114,19 @@ def get_elevation(lat: float, lon: float) -> Optional[float]:
     Returns:
         Elevation in meters or None if failed
     """
+    cache_key = f"elevation:{lat:.5f},{lon:.5f}"
+    cached = _load_geo_cache().get(cache_key)
+    if cached is not None:
+        return float(cached)
+
     try:
         url = f"https://api.open-elevation.com/api/v1/lookup?locations={lat},{lon}"
 
-        req = urllib.request.Request(url, headers={
-            'User-Agent': 'ADS-B Tracker/1.0 (personal use)'
-        })
-
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            if data and 'results' in data and len(data['results']) > 0:
-                return float(data['results'][0]['elevation'])
+        data = _fetch_json(url)
+        if data and 'results' in data and len(data['results']) > 0:
+            elevation = float(data['results'][0]['elevation'])
+            _store_geo_cache(cache_key, elevation)
+            return elevation
     except Exception as e:
         print(f"Elevation lookup failed: {e}", file=sys.stderr)
 
@@ -101,9 +147,10 @@ def calculate_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> flo
     lat1_rad = math.radians(lat1)
     lat2_rad = math.radians(lat2)
     lon_diff = math.radians(lon2 - lon1)
+    cos_lat2 = math.cos(lat2_rad)
 
-    x = math.sin(lon_diff) * math.cos(lat2_rad)
-    y = math.cos(lat1_rad) * math.sin(lat2_rad) - math.sin(lat1_rad) * math.cos(lat2_rad) * math.cos(lon_diff)
+    x = math.sin(lon_diff) * cos_lat2
+    y = math.cos(lat1_rad) * math.sin(lat2_rad) - math.sin(lat1_rad) * cos_lat2 * math.cos(lon_diff)
 
     bearing = math.atan2(x, y)
     bearing_deg = math.degrees(bearing)
@@ -112,6 +159,37 @@ def calculate_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> flo
     return (bearing_deg + 360) % 360
 
 
+def calculate_bearings(points: Sequence[Tuple[float, float]]) -> List[float]:
+    """
+    Calculate the bearings between consecutive points of a track.
+
+    Same result as calling calculate_bearing() on every consecutive pair,
+    but the sine and cosine of each latitude are computed only once.
+
+    Args:
+        points: Sequence of (lat, lon) coordinates
+
+    Returns:
+        List of len(points) - 1 bearings in degrees (0-360, where 0 is North)
+    """
+    # Module attribute lookups are hoisted out of the per-pair loop
+    sin, cos, atan2, radians, degrees = math.sin, math.cos, math.atan2, math.radians, math.degrees
+
+    # (lon, sin(lat), cos(lat)) per point
+    trig = []
+    for lat, lon in points:
+        lat_rad = radians(lat)
+        trig.append((lon, sin(lat_rad), cos(lat_rad)))
+
+    bearings = []
+    for (lon1, sin_lat1, cos_lat1), (lon2, sin_lat2, cos_lat2) in zip(trig, trig[1:]):
+        lon_diff = radians(lon2 - lon1)
+        x = sin(lon_diff) * cos_lat2
+        y = cos_lat1 * sin_lat2 - sin_lat1 * cos_lat2 * cos(lon_diff)
+        bearings.append((degrees(atan2(x, y)) + 360) % 360)
+    return bearings
+
+
 def calculate_3d_distance(lat1: float, lon1: float, alt1_m: float,
                           lat2: float, lon2: float, alt2_m: float) -> float:
     """
@@ -233,7 +311,7 @@ def save_home_location(config: dict) -> bool:
         return False
 
 
-def get_home_location() -> dict:
+def get_home_location() -> Mapping:
     """
     Get home location from config file, environment variables, or prompt user.
 
@@ -243,15 +321,27 @@ def get_home_location() -> dict:
     3. Interactive setup (if running in terminal)
     4. Default location (Central London)
 
+    The location is resolved once and cached; callers share a read-only view.
+
     Returns:
-        dict with lat, lon, elevation_m, elevation_ft, address, display_name
+        Mapping with lat, lon, elevation_m, elevation_ft, address, display_name
     """
     global _cached_home_location
 
     # Return cached location if available
-    if _cached_home_location:
+    cached = _cached_home_location
+    if cached:
+        return cached
+
+    with _home_location_lock:
+        # Another thread may have resolved it while we waited
+        if not _cached_home_location:
+            _cached_home_location = MappingProxyType(_resolve_home_location())
         return _cached_home_location
 
+
+def _resolve_home_location() -> dict:
+    """Look up the home location in priority order (see get_home_location)."""
     # Check environment variables first
     env_lat = os.getenv("ADSB_HOME_LAT")
     env_lon = os.getenv("ADSB_HOME_LON")
@@ -262,7 +352,7 @@ def get_home_location() -> dict:
             lat = float(env_lat)
             lon = float(env_lon)
             elev = float(env_elev) if env_elev else 0.0
-            _cached_home_location = {
+            return {
                 'lat': lat,
                 'lon': lon,
                 'elevation_m': elev,
@@ -270,7 +360,6 @@ def get_home_location() -> dict:
                 'address': 'Environment variables',
                 'display_name': f'{lat}, {lon}'
             }
-            return _cached_home_location
         except ValueError:
             pass
 
@@ -280,9 +369,8 @@ def get_home_location() -> dict:
             with open(HOME_CONFIG_FILE, 'r') as f:
                 config = json.load(f)
                 if 'lat' in config and 'lon' in config:
-                    _cached_home_location = config
                     print(f"Loaded home location: {config.get('display_name', 'Unknown')}")
-                    return _cached_home_location
+                    return config
         except Exception as e:
             print(f"Warning: Could not load config file: {e}", file=sys.stderr)
 
@@ -293,12 +381,11 @@ def get_home_location() -> dict:
         if setup == 'y':
             result = setup_home_location()
             if result:
-                _cached_home_location = result
-                return _cached_home_location
+                return result
 
     # Fallback default (Central London - Big Ben)
     print("Using default location (Central London)")
-    _cached_home_location = {
+    return {
         'lat': 51.5007,
         'lon': -0.1246,
         'elevation_m': 5.0,
@@ -306,7 +393,6 @@ def get_home_location() -> dict:
         'address': 'Default',
         'display_name': 'Central London, UK'
     }
-    return _cached_home_location
 
 
 def set_home_from_address(address: str) -> Optional[dict]:
@@ -3,6 +3,8 @@
 Watch and auto-update map from ADS-B CSV files.
 
 Continuously regenerates the map HTML file as new positions are captured.
+Uses file system notifications when the optional watchdog package is
+installed, and falls back to polling otherwise.
 
 Usage:
     python3 watch_map.py              # Watch current positions
@@ -11,14 +13,160 @@ Usage:
 """
 
 import argparse
+import csv
+import hashlib
 import os
+import sys
+import threading
 import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.lib.config import (
     get_history_csv_path, get_current_csv_path,
-    DEFAULT_MAP_HTML, DEFAULT_CURRENT_MAP_HTML,
+    DEFAULT_MAP_HTML, DEFAULT_CURRENT_MAP_HTML, CSV_COLUMNS,
 )
-from plot_map import read_csv_positions, create_map
+from plot_map import (
+    read_csv_positions, position_fields_getter, parse_position_row,
+    create_map, merge_trajectories,
+)
+
+# Optional file system notifications (inotify/FSEvents) instead of polling
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+# Quiet period used to coalesce bursts of writes before regenerating
+WATCH_DEBOUNCE_SECONDS = 0.2
+
+# Parsed positions per CSV path, keyed by the file's (mtime_ns, size)
+_csv_cache: Dict[str, Tuple[Tuple[int, int], List[Dict[str, Any]]]] = {}
+
+
+def file_signature(path) -> Optional[Tuple[int, int]]:
+    """Return (mtime_ns, size) for a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def read_csv_positions_cached(csv_path) -> List[Dict[str, Any]]:
+    """
+    Read positions from a CSV file, reusing the last parse if the file is unchanged.
+
+    Callers get their own copies of the rows, so changes they make (such as
+    create_map's heading backfill) never leak into the cache.
+    """
+    csv_path = str(csv_path)
+    signature = file_signature(csv_path)
+    cached = _csv_cache.get(csv_path)
+    if signature is not None and cached and cached[0] == signature:
+        return [dict(p) for p in cached[1]]
+
+    positions = read_csv_positions(csv_path)
+    if signature is not None:
+        _csv_cache[csv_path] = (signature, positions)
+        return [dict(p) for p in positions]
+    return positions
+
+
+class CsvTail:
+    """
+    Incrementally parse positions appended to a CSV file.
+
+    Keeps a byte offset into the file and only parses complete lines added
+    since the last read. Starts over if the file is replaced or truncated.
+    """
+
+    def __init__(self, csv_path):
+        self.csv_path = str(csv_path)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._positions: List[Dict[str, Any]] = []
+        self._inode = None
+        self._offset = 0
+        self._line_num = 0
+        self._get_fields = None
+
+    def read(self) -> List[Dict[str, Any]]:
+        """
+        Return all positions in the file, parsing only newly appended lines.
+
+        The parsed rows stay private; callers get copies they are free to change.
+        """
+        try:
+            st = os.stat(self.csv_path)
+        except OSError:
+            self._reset()
+            return read_csv_positions(self.csv_path)
+
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            self._reset()
+            self._inode = st.st_ino
+
+        if st.st_size > self._offset:
+            with open(self.csv_path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(st.st_size - self._offset)
+
+            # Leave a partially written last line for the next read
+            end = data.rfind(b"\n") + 1
+            self._offset += end
+            lines = data[:end].decode("utf-8", errors="replace").splitlines()
+
+            if lines and self._get_fields is None:
+                self._get_fields = position_fields_getter(next(csv.reader([lines[0]])))
+                self._line_num = 1
+                lines = lines[1:]
+
+            for row in csv.reader(lines):
+                self._line_num += 1
+                try:
+                    position = parse_position_row(self._get_fields(row))
+                    if position:
+                        self._positions.append(position)
+                except ValueError as e:
+                    print(f"Warning: Skipping row {self._line_num} in {self.csv_path}: {e}", file=sys.stderr)
+
+        return [dict(p) for p in self._positions]
+
+
+def positions_digest(positions: List[Dict[str, Any]], current_icaos: set) -> bytes:
+    """Fingerprint everything create_map renders from the merged positions."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(sorted(current_icaos)).encode())
+    for p in positions:
+        digest.update(repr(tuple(p.get(column) for column in CSV_COLUMNS)).encode())
+    return digest.digest()
+
+
+def start_file_observer(paths: List[str], changed: threading.Event):
+    """Start a watchdog observer that sets `changed` when any of paths is written."""
+    watched = {os.path.abspath(p) for p in paths}
+
+    class ChangeHandler(FileSystemEventHandler):
+        # Only writes matter; open/close events from our own reads are ignored
+        def on_modified(self, event):
+            if os.path.abspath(event.src_path) in watched:
+                changed.set()
+
+        on_created = on_modified
+
+        def on_moved(self, event):
+            if os.path.abspath(event.dest_path) in watched:
+                changed.set()
+
+    observer = Observer()
+    for directory in {os.path.dirname(p) for p in watched}:
+        observer.schedule(ChangeHandler(), directory, recursive=False)
+    observer.daemon = True
+    observer.start()
+    return observer
 
 
 def watch_and_update(csv_path: str, output_path: str = None,
@@ -27,47 +175,61 @@ def watch_and_update(csv_path: str, output_path: str = None,
     if output_path is None:
         output_path = str(DEFAULT_MAP_HTML)
 
-    print(f"Watching {csv_path}")
-    print(f"Updating {output_path} every {interval} second{'s' if interval != 1 else ''}...")
-    print("Press Ctrl+C to stop.")
-    print()
-
     # Determine historical CSV path for merging trajectories
     historical_csv_path = None
     if not historical:
         historical_csv_path = str(get_history_csv_path())
 
-    last_size = 0
+    # Regenerate only when one of the input files changed
+    watched_paths = [csv_path]
+    if not historical:
+        watched_paths += [historical_csv_path, str(get_current_csv_path())]
+
+    changed = threading.Event()
+    observer = None
+    if WATCHDOG_AVAILABLE:
+        try:
+            observer = start_file_observer(watched_paths, changed)
+        except OSError as e:
+            # e.g. a watched directory the collector has not created yet
+            print(f"Warning: File notifications unavailable ({e}), polling instead", file=sys.stderr)
+
+    print(f"Watching {csv_path}")
+    if observer is not None:
+        print(f"Updating {output_path} on change (at most every {interval} second{'s' if interval != 1 else ''})...")
+    else:
+        print(f"Updating {output_path} every {interval} second{'s' if interval != 1 else ''}...")
+    print("Press Ctrl+C to stop.")
+    print()
+
+    # The history CSV is append-only, so it is tailed instead of re-read
+    history_tail = CsvTail(get_history_csv_path())
+
+    def load_positions(path) -> List[Dict[str, Any]]:
+        if str(path) == history_tail.csv_path:
+            return history_tail.read()
+        return read_csv_positions_cached(path)
+
+    last_signature = None
+    last_digest = None
     update_count = 0
 
     try:
         while True:
-            if os.path.exists(csv_path):
-                current_size = os.path.getsize(csv_path)
-
-                if current_size != last_size or update_count == 0:
-                    # File changed or first run
-                    positions = read_csv_positions(csv_path)
+            # One stat per watched file per pass; the signatures double as the
+            # existence checks for the inputs below
+            signature = tuple(file_signature(p) for p in watched_paths)
+            if signature[0] is not None:
+                if signature != last_signature:
+                    # Files changed or first run
+                    positions = load_positions(csv_path)
 
                     # Merge historical data for trajectories
-                    if positions and historical_csv_path and os.path.exists(historical_csv_path) and not historical:
-                        historical_positions = read_csv_positions(historical_csv_path)
+                    if positions and not historical and signature[1] is not None:
+                        historical_positions = load_positions(historical_csv_path)
 
                         if historical_positions:
-                            current_icaos = set(p["icao"] for p in positions)
-
-                            for hist_pos in historical_positions:
-                                if hist_pos["icao"] in current_icaos:
-                                    is_duplicate = any(
-                                        p["icao"] == hist_pos["icao"] and
-                                        abs(p["lat"] - hist_pos["lat"]) < 0.0001 and
-                                        abs(p["lon"] - hist_pos["lon"]) < 0.0001
-                                        for p in positions
-                                    )
-                                    if not is_duplicate:
-                                        positions.append(hist_pos)
-                                else:
-                                    positions.append(hist_pos)
+                            merge_trajectories(positions, historical_positions)
 
                     if positions:
                         title = "ADS-B Current Positions with Trajectories" if not historical else "ADS-B Historical Positions"
@@ -75,25 +237,44 @@ def watch_and_update(csv_path: str, output_path: str = None,
                         # Determine current ICAOs for marker display
                         current_icaos_for_map = set()
                         if not historical:
-                            current_csv_path = get_current_csv_path()
-                            if current_csv_path.exists():
-                                current_only = read_csv_positions(str(current_csv_path))
+                            if signature[2] is not None:
+                                current_only = load_positions(watched_paths[2])
                                 current_icaos_for_map = set(p["icao"] for p in current_only)
 
-                        create_map(positions, output_path, title, refresh_interval=0, current_icaos=current_icaos_for_map)
-                        update_count += 1
-                        print(f"[{update_count}] Map updated: {len(positions)} positions, {len(set(p['icao'] for p in positions))} aircraft")
+                        # Skip regeneration if the merged data is identical to last render
+                        digest = positions_digest(positions, current_icaos_for_map)
+                        if digest == last_digest:
+                            print("Waiting... (positions unchanged)")
+                        else:
+                            create_map(positions, output_path, title, refresh_interval=0, current_icaos=current_icaos_for_map)
+                            last_digest = digest
+                            update_count += 1
+                            print(f"[{update_count}] Map updated: {len(positions)} positions, {len(set(p['icao'] for p in positions))} aircraft")
                     else:
                         print("No positions found, skipping update...")
 
-                    last_size = current_size
+                    last_signature = signature
                 else:
                     print(f"Waiting... (no changes detected)")
 
-            time.sleep(interval)
+            if observer is None:
+                time.sleep(interval)
+            else:
+                # Block until a watched file changes, then let the burst of
+                # writes settle (bounded by interval) before regenerating.
+                # The timeout keeps Ctrl+C working on Windows and doubles as
+                # a periodic safety poll
+                changed.wait(timeout=interval)
+                changed.clear()
+                deadline = time.monotonic() + interval
+                while time.monotonic() < deadline and changed.wait(WATCH_DEBOUNCE_SECONDS):
+                    changed.clear()
 
     except KeyboardInterrupt:
         print(f"\n\nStopped. Total updates: {update_count}")
+    finally:
+        if observer is not None:
+            observer.stop()
 
 
 def main():
@@ -111,7 +292,8 @@ Examples:
     parser.add_argument("--csv", default=None, help="Path to CSV file")
     parser.add_argument("--historical", action="store_true", help="Watch historical CSV file")
     parser.add_argument("--output", default=None, help="Output HTML file path")
-    parser.add_argument("--interval", type=int, default=1, help="Update interval in seconds (default: 1)")
+    parser.add_argument("--interval", type=int, default=1,
+                        help="Polling interval, or max debounce with watchdog, in seconds (default: 1)")
 
     args = parser.parse_args()
 